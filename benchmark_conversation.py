@@ -0,0 +1,110 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Payload and seller prompt size per follow-up turn of a browsing session.
+# Compares the seller without memory, where the concierge has to repeat the
+# conversation in every task, with the seller's per-context memory keeping
+# full answers, and keeping them in the compact form the seller stores. Sizes are counted without calling
+# any LLM; tokens are estimated at 4 characters each.
+#
+#   python benchmark_conversation.py --turns 10
+
+import json
+import os
+import sys
+
+import click
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, "remote_agent"))
+
+from agent import CATALOG, ProductSellerAgent, get_product_details  # noqa: E402
+from conversation import compact_response, format_history  # noqa: E402
+
+SESSION_ID = "benchmark-session"
+
+
+def _conversation(turns: int) -> list[tuple[str, str]]:
+    """Follow-up questions about catalog products with seller-like answers."""
+    product_ids = list(CATALOG.snapshot.products)
+    conversation = []
+    for i in range(turns):
+        product_id = product_ids[i % len(product_ids)]
+        details = json.loads(get_product_details(product_id))
+        question = (
+            f"What are the details for product {product_id}?"
+            if i == 0
+            else f"And product {product_id}, how does it compare?"
+        )
+        answer = (
+            f"Product {product_id} is the {details['name']} by {details['brand']}, "
+            f"in the {details['category']} category of the {details['department']} "
+            f"department. It retails for {details['retail_price']} (SKU {details['sku']}). "
+            "Compared with the previous product it sits in a different price range; "
+            "let me know if you would like details on anything else in the catalog."
+        )
+        conversation.append((question, answer))
+    return conversation
+
+
+def _no_memory_task(conversation, turn: int) -> str:
+    """The task a concierge has to send when the seller remembers nothing."""
+    context = " ".join(
+        f"Earlier the user asked: {q} The seller answered: {a}"
+        for q, a in conversation[:turn]
+    )
+    return f"{context} New request: {conversation[turn][0]}".strip()
+
+
+def _prompt(task: str, history: str) -> str:
+    return ProductSellerAgent.TaskInstruction.format(
+        conversation_history=history, user_prompt=task, session_id=SESSION_ID
+    )
+
+
+@click.command()
+@click.option("--turns", "turns", default=10, type=int)
+@click.option("--max-history-chars", "max_history_chars", default=1500, type=int)
+def main(turns, max_history_chars):
+    """Reports task payload and seller prompt size for each turn."""
+    conversation = _conversation(turns)
+    print(
+        f"{'turn':<6}{'payload (B)':>24}{'prompt tokens (est.)':>36}"
+        f"{'of which conversation':>36}\n"
+        f"{'':<6}{'no memory':>12}{'memory':>12}"
+        + f"{'no memory':>12}{'full':>12}{'compact':>12}" * 2
+    )
+    product_ids = CATALOG.snapshot.products
+    instructions = len(_prompt("", ""))
+    for turn in range(turns):
+        history = tuple(conversation[:turn])
+        compact = tuple((q, compact_response(a, product_ids)) for q, a in history)
+        task = conversation[turn][0]
+        no_memory_task = _no_memory_task(conversation, turn)
+        prompts = (
+            _prompt(no_memory_task, format_history(())),
+            _prompt(task, format_history(history, max_history_chars)),
+            _prompt(task, format_history(compact, max_history_chars)),
+        )
+        print(
+            f"{turn + 1:<6}{len(no_memory_task.encode()):>12}{len(task.encode()):>12}"
+            + "".join(f"{len(p) // 4:>12}" for p in prompts)
+            + "".join(f"{(len(p) - instructions) // 4:>12}" for p in prompts)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Cold start benchmark for both agents. Every measurement runs in a fresh
+# interpreter so nothing is served from an already warm sys.modules.
+#
+#   python benchmark_startup.py --runs 5
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from statistics import median
+
+import click
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+REMOTE_AGENT_DIR = os.path.join(ROOT_DIR, "remote_agent")
+
+SELLER_IMPORT = """
+import time
+started = time.perf_counter()
+import agent_executor
+print(time.perf_counter() - started)
+"""
+
+CONCIERGE_STARTUP = """
+import asyncio
+import time
+started = time.perf_counter()
+from purchasing_concierge.agent import root_agent
+print(time.perf_counter() - started)
+asyncio.run(root_agent.canonical_tools())
+print(time.perf_counter() - started)
+"""
+
+
+def _run_python(code: str, cwd: str) -> list[float]:
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    # Agents may print while starting up, timings are the last lines
+    return [float(line) for line in output.split() if _is_float(line)]
+
+
+def _is_float(value: str) -> bool:
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def seller_time_to_first_request(timeout: float) -> float:
+    """Seconds from process spawn until the seller answers its agent card."""
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/.well-known/agent.json"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, ".", "--host", "127.0.0.1", "--port", str(port)],
+        cwd=REMOTE_AGENT_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("Seller server exited during startup")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise TimeoutError(f"Seller did not serve {url} within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+@click.command()
+@click.option("--runs", "runs", default=3, type=int)
+@click.option("--timeout", "timeout", default=60.0, type=float)
+def main(runs, timeout):
+    """Reports import time and time-to-first-request for each entry point."""
+    seller_import, seller_first_request = [], []
+    concierge_import, concierge_first_tools = [], []
+    for _ in range(runs):
+        seller_import.extend(_run_python(SELLER_IMPORT, REMOTE_AGENT_DIR))
+        seller_first_request.append(seller_time_to_first_request(timeout))
+        imported, tools_ready = _run_python(CONCIERGE_STARTUP, ROOT_DIR)[-2:]
+        concierge_import.append(imported)
+        concierge_first_tools.append(tools_ready)
+
+    print(f"{'entry point':<22}{'import (s)':>12}{'first request (s)':>20}")
+    print(
+        f"{'remote_agent':<22}{median(seller_import):>12.3f}"
+        f"{median(seller_first_request):>20.3f}"
+    )
+    # The concierge has no local server, the first request it can serve is
+    # bounded by resolving its tools (which loads the BigQuery stack).
+    print(
+        f"{'purchasing_concierge':<22}{median(concierge_import):>12.3f}"
+        f"{median(concierge_first_tools):>20.3f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+# Wire format benchmark for concierge -> seller calls, run in process against
+# the real seller app through starlette's TestClient. Compares the stock A2A
+# app with a plain json client (before) to the seller app from create_app and
+# the concierge's patched client (after): pydantic-core serialization and
+# negotiated gzip/zstd compression.
+#
+# Two calls are measured: a batched `{"product_ids": [...]}` lookup, answered
+# from the catalog, and a free text question. The crew is replaced by a
+# fixed answer of the usual shape so that no LLM is called. Round trips are
+# in process, so they include both sides' CPU but no network time; across
+# clouds the response bytes are what dominates.
+#
+#   python benchmark_wire_format.py --products 50
+
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+from uuid import uuid4
+
+import click
+import requests
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    DataPart,
+    Message,
+    MessageSendParams,
+    Part,
+    Role,
+    SendMessageRequest,
+    SendMessageResponse,
+    TextPart,
+)
+from starlette.testclient import TestClient
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, "remote_agent"))
+os.environ.setdefault("AGENT_BASE_URL", "http://testserver")
+
+from agent import CATALOG, ProductSellerAgent, search_products  # noqa: E402
+from agent_executor import ProductSellerAgentExecutor  # noqa: E402
+from compression import compress, negotiate  # noqa: E402
+from server import ProductSellerApplication, build_agent_card, create_app  # noqa: E402
+
+from purchasing_concierge import remote_agent_connection  # noqa: E402
+
+# What requests sends by default
+CLIENT_ACCEPT_ENCODING = requests.utils.default_headers()["Accept-Encoding"]
+
+
+def _crew_answer() -> str:
+    """A seller answer listing the catalog's products, like the crew writes."""
+    lines = ["Here are the products I found in the catalog:"]
+    for i, product in enumerate(json.loads(search_products(limit=50)), start=1):
+        lines.append(
+            f"{i}. **{product['name']}** (ID {product['product_id']}) by "
+            f"{product['brand']}, {product['category']} for {product['department']}, "
+            f"{product['retail_price']}."
+        )
+    lines.append("Let me know if you would like more details on any of them.")
+    return "\n".join(lines)
+
+
+def _request(part: Part) -> SendMessageRequest:
+    return SendMessageRequest(
+        id=str(uuid4()),
+        params=MessageSendParams(
+            message=Message(
+                role=Role.user,
+                message_id=uuid4().hex,
+                context_id=uuid4().hex,
+                parts=[part],
+            )
+        ),
+    )
+
+
+def _build_requests(products: int) -> dict[str, SendMessageRequest]:
+    product_ids = list(CATALOG.snapshot.products)
+    batch = [product_ids[i % len(product_ids)] for i in range(products)]
+    return {
+        "product records": _request(Part(root=DataPart(data={"product_ids": batch}))),
+        "crew answer": _request(
+            Part(root=TextPart(text="What products do you have? List all of them."))
+        ),
+    }
+
+
+def _baseline_app():
+    return A2AStarletteApplication(
+        agent_card=build_agent_card(os.environ["AGENT_BASE_URL"]),
+        http_handler=DefaultRequestHandler(
+            agent_executor=ProductSellerAgentExecutor(),
+            task_store=InMemoryTaskStore(),
+        ),
+    )
+
+
+def _send_before(client: TestClient, request: SendMessageRequest) -> tuple[int, int]:
+    """The client before: model_dump + json, no compression."""
+    body = json.dumps(request.model_dump(mode="json", exclude_none=True)).encode("utf-8")
+    response = client.post(
+        "/",
+        content=body,
+        headers={"Content-Type": "application/json", "Accept-Encoding": CLIENT_ACCEPT_ENCODING},
+    )
+    response.raise_for_status()
+    SendMessageResponse.model_validate(json.loads(response.content))
+    return len(body), len(response.content)
+
+
+def _connect_after(client: TestClient) -> remote_agent_connection.RemoteAgentConnections:
+    """The concierge's patched client, posting through the TestClient."""
+
+    def post(url, data, headers, **kwargs):
+        return client.post(
+            url, content=data, headers={"Accept-Encoding": CLIENT_ACCEPT_ENCODING, **headers}
+        )
+
+    remote_agent_connection.requests = SimpleNamespace(
+        post=post, exceptions=requests.exceptions
+    )
+    return remote_agent_connection.RemoteAgentConnections(
+        build_agent_card(os.environ["AGENT_BASE_URL"]), os.environ["AGENT_BASE_URL"]
+    )
+
+
+def _send_after(connection, request: SendMessageRequest) -> tuple[int, int]:
+    connection.send_message(request)
+    return remote_agent_connection.last_payload_bytes()
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def _server_render_us(
+    response: SendMessageResponse, iterations: int
+) -> tuple[tuple[float, float], tuple[float, float]]:
+    """CPU to serialize and to compress one response body, before and after."""
+    before_app = _baseline_app()
+    after_app = ProductSellerApplication(
+        agent_card=build_agent_card(os.environ["AGENT_BASE_URL"]), http_handler=None
+    )
+    encoding = negotiate(CLIENT_ACCEPT_ENCODING)
+    body = after_app._create_response(response).body
+    compress_us = (
+        _per_call_us(lambda: compress(body, encoding), iterations)
+        if encoding is not None and len(body) >= 1024
+        else 0.0
+    )
+    return (
+        (_per_call_us(lambda: before_app._create_response(response).body, iterations), 0.0),
+        (_per_call_us(lambda: after_app._create_response(response).body, iterations), compress_us),
+    )
+
+
+def _measure(
+    name: str,
+    request: SendMessageRequest,
+    before_client: TestClient,
+    after_client: TestClient,
+    connection,
+    iterations: int,
+) -> list[tuple]:
+    # The first call tells the client which request codings the seller accepts
+    _send_after(connection, request)
+    before_bytes = _send_before(before_client, request)
+    after_bytes = _send_after(connection, request)
+    before_us = _per_call_us(lambda: _send_before(before_client, request), iterations)
+    after_us = _per_call_us(lambda: _send_after(connection, request), iterations)
+    response = after_client.post("/", content=request.model_dump_json(exclude_none=True))
+    before_render, after_render = _server_render_us(
+        SendMessageResponse.model_validate(response.json()), iterations
+    )
+    return [
+        (name, "before", *before_bytes, before_us, *before_render),
+        (name, "after", *after_bytes, after_us, *after_render),
+    ]
+
+
+@click.command()
+@click.option("--products", "products", default=50, type=int)
+@click.option("--iterations", "iterations", default=200, type=int)
+def main(products, iterations):
+    """Reports bytes on the wire and serialization CPU per call."""
+    answer = _crew_answer()
+    ProductSellerAgent.invoke = lambda self, query, session_id, history=(): answer
+    rows = []
+    # The executor and client log every request, keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        before_client = TestClient(_baseline_app().build())
+        after_client = TestClient(create_app())
+        connection = _connect_after(after_client)
+        for name, request in _build_requests(products).items():
+            rows += _measure(name, request, before_client, after_client, connection, iterations)
+
+    print(
+        f"{'call':<18}{'':<8}{'request (B)':>12}{'response (B)':>14}"
+        f"{'round trip (us)':>17}{'serialize (us)':>16}{'compress (us)':>15}"
+    )
+    for name, label, request_bytes, response_bytes, round_trip, serialize, compress_us in rows:
+        print(
+            f"{name:<18}{label:<8}{request_bytes:>12}{response_bytes:>14}"
+            f"{round_trip:>17.0f}{serialize:>16.1f}{compress_us:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
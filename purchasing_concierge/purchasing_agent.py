@@ -14,22 +14,32 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import asyncio
 import json
+import os
+import time
 import uuid
-from typing import List
+from typing import Any, List, Optional
 import httpx
 
 import google.auth
-from google.adk.tools.bigquery import BigQueryToolset
 from google.adk import Agent
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
 from google.adk.agents.readonly_context import ReadonlyContext
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.tools.tool_context import ToolContext
-from .remote_agent_connection import RemoteAgentConnections, TaskUpdateCallback
+from .remote_agent_connection import (
+    RemoteAgentConnections,
+    TaskUpdateCallback,
+    last_payload_bytes,
+)
+from .usage import Usage, UsageLedger, remote_usage
 
 from a2a.client import A2ACardResolver
 from a2a.types import (
     AgentCard,
+    DataPart,
     MessageSendParams,
     Part,
     SendMessageRequest,
@@ -38,6 +48,61 @@ from a2a.types import (
     Task,
 )
 
+ORDER_ITEMS_TABLE = "bigquery-public-data.thelook_ecommerce.order_items"
+
+# Ranking metric accepted by `get_top_products_with_details` -> column to sort by
+TOP_PRODUCTS_METRICS = {"orders": "order_count", "revenue": "revenue"}
+
+TOP_PRODUCTS_QUERY = """
+SELECT
+  product_id,
+  COUNT(DISTINCT order_id) AS order_count,
+  ROUND(SUM(sale_price), 2) AS revenue
+FROM `{table}`
+GROUP BY product_id
+ORDER BY {order_by} DESC
+LIMIT @limit
+"""
+
+# Seller skill that accepts a batched `{"product_ids": [...]}` data part
+PRODUCT_DETAILS_SKILL = "get_product_details"
+
+# Session state key holding when the pending model call started
+MODEL_CALL_STARTED = "temp:model_call_started"
+
+
+class LazyBigQueryToolset(BaseToolset):
+    """Defers loading the BigQuery client stack until the tools are first listed.
+
+    `google.adk.tools.bigquery` pulls in the BigQuery client libraries, which
+    dominates the concierge's import time. Building the real toolset on first
+    use keeps `root_agent` cheap to construct on a cold start.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._toolset: Optional[BaseToolset] = None
+        self.tool_names: set[str] = set()
+
+    def _get_toolset(self) -> BaseToolset:
+        if self._toolset is None:
+            from google.adk.tools.bigquery import BigQueryToolset
+
+            self._toolset = BigQueryToolset()
+        return self._toolset
+
+    async def get_tools(
+        self, readonly_context: Optional[ReadonlyContext] = None
+    ) -> List[BaseTool]:
+        tools = await self._get_toolset().get_tools(readonly_context)
+        self.tool_names.update(tool.name for tool in tools)
+        return tools
+
+    async def close(self) -> None:
+        if self._toolset is not None:
+            await self._toolset.close()
+
+
 class PurchasingAgent:
     """The purchasing agent.
 
@@ -54,9 +119,10 @@ class PurchasingAgent:
         self.cards: dict[str, AgentCard] = {}
         self.agents = ""
         self.a2a_client_init_status = False
-        
+        self._bigquery_client = None
+        self.usage = UsageLedger()
 
-        self.bigquery_toolset = BigQueryToolset()
+        self.bigquery_toolset = LazyBigQueryToolset()
 
     def create_agent(self) -> Agent:
         return Agent(
@@ -64,13 +130,17 @@ class PurchasingAgent:
             name="purchasing_agent",
             global_instruction=self.root_instruction,
             before_model_callback=self.before_model_callback,
+            after_model_callback=self.after_model_callback,
             before_agent_callback=self.before_agent_callback,
+            after_agent_callback=self.after_agent_callback,
+            after_tool_callback=self.after_tool_callback,
             description=(
                 "This purchasing agent orchestrates SQL queries against the underlying table and fulfill"
                 " tasks that can be performed by the seller agents."
             ),
             tools=[
                 self.send_task,
+                self.get_top_products_with_details,
                 self.bigquery_toolset,
             ],
         )
@@ -84,9 +154,14 @@ Execution:
 - For actionable tasks, you can use `send_task` to assign tasks to remote agents to perform.
 - CRITICAL DELEGATION RULE: If the user's inquiry is about a specific product (e.g., asking for its price, details, or brand), you MUST use the `send_task` tool.
   - The designated remote agent for product inquiries is likely named 'product_seller_agent' or similar. Use the most appropriate agent name listed below.
-  - The task argument in `send_task` should include the full user query, especially any mentioned product IDs.
-- When the remote agent is repeatedly asking for user confirmation, assume that the remote agent doesn't have access to user's conversation context.
-    So improve the task description to include all the necessary information related to that agent
+  - The task argument in `send_task` should include the user query, especially any mentioned product IDs.
+- For browsing questions that are about the catalog rather than orders (e.g., finding products by name, brand, category, department or price range),
+    send them directly to the seller agent with `send_task`, which can search its catalog. Do not query BigQuery first just to find product IDs.
+- For questions that combine order statistics with product details (e.g., "top 5 products by orders, with names and prices"),
+    use `get_top_products_with_details` instead of querying BigQuery and then calling `send_task` for each product.
+    It returns the joined table in a single call.
+- Remote agents remember the earlier turns of this session. For follow-up requests, only send what is new (e.g., "What about its price?"),
+    instead of repeating the conversation so far in the task description.
 - Never ask user permission when you want to connect with remote agents. If you need to make connection with multiple remote agents, directly
     connect with them without asking user permission or asking user preference
 - Always show the detailed response information from the seller agent and propagate it properly to the user.
@@ -144,6 +219,91 @@ Current active seller agent: {current_agent["active_agent"]}
             if "session_id" not in state:
                 state["session_id"] = str(uuid.uuid4())
             state["session_active"] = True
+        # Invocation-scoped ("temp:") state is dropped when the invocation
+        # ends, so a model call that fails or reports no usage leaks nothing
+        state[MODEL_CALL_STARTED] = time.perf_counter()
+
+    async def after_model_callback(
+        self, callback_context: CallbackContext, llm_response
+    ):
+        if llm_response.partial:
+            return
+        started = callback_context.state.get(MODEL_CALL_STARTED)
+        callback_context.state[MODEL_CALL_STARTED] = None
+        usage_metadata = llm_response.usage_metadata
+        if usage_metadata is None:
+            return
+        self._record_usage(
+            callback_context.state,
+            callback_context.agent_name,
+            Usage(
+                model_calls=1,
+                prompt_tokens=usage_metadata.prompt_token_count or 0,
+                completion_tokens=usage_metadata.candidates_token_count or 0,
+                model_latency_s=(
+                    time.perf_counter() - started if started is not None else 0.0
+                ),
+            ),
+        )
+
+    async def after_agent_callback(self, callback_context: CallbackContext):
+        if "usage" in callback_context.state:
+            print(f"Session usage ===> {json.dumps(callback_context.state['usage'])}")
+
+    async def after_tool_callback(
+        self,
+        tool: BaseTool,
+        args: dict[str, Any],
+        tool_context: ToolContext,
+        tool_response,
+    ):
+        # The BigQuery toolset's `execute_sql` returns only the rows, so the
+        # bytes its query processed come from a (free) dry run of the same SQL
+        if tool.name not in self.bigquery_toolset.tool_names or "query" not in args:
+            return None
+        if (
+            not isinstance(tool_response, dict)
+            or tool_response.get("status") != "SUCCESS"
+        ):
+            return None
+        bytes_processed = await asyncio.to_thread(
+            self._estimate_query_bytes, args["query"], args.get("project_id")
+        )
+        self._record_usage(
+            tool_context.state,
+            tool_context.agent_name,
+            Usage(bigquery_bytes_processed=bytes_processed),
+            tool.name,
+        )
+        return None
+
+    def _record_usage(
+        self, state, agent_name: str, usage: Usage, tool_name: str | None = None
+    ) -> None:
+        """Accounts usage to the session (in its state too), the agent and the tool."""
+        self.usage.record(state["session_id"], agent_name, usage, tool_name)
+        session_usage = Usage.from_dict(state.get("usage", {}))
+        session_usage.add(usage)
+        state["usage"] = session_usage.as_dict()
+
+    def _a2a_usage(self, send_response: SendMessageResponse) -> Usage:
+        """Usage of the A2A request just made on this thread, as reported by both sides."""
+        request_bytes, response_bytes = last_payload_bytes()
+        usage = Usage(
+            a2a_requests=1,
+            a2a_request_bytes=request_bytes,
+            a2a_response_bytes=response_bytes,
+        )
+        if isinstance(send_response.root, SendMessageSuccessResponse) and isinstance(
+            send_response.root.result, Task
+        ):
+            for artifact in send_response.root.result.artifacts or []:
+                usage.add(remote_usage(artifact.metadata))
+        return usage
+
+    def usage_report(self) -> dict[str, Any]:
+        """Local report of usage per session, agent and tool in this process."""
+        return self.usage.report()
 
     def list_remote_agents(self):
         """List the available remote agents you can use to delegate the task."""
@@ -166,8 +326,9 @@ Current active seller agent: {current_agent["active_agent"]}
 
         Args:
             agent_name: The name of the agent to send the task to.
-            task: The comprehensive conversation context summary
-                and goal to be achieved regarding user inquiry and purchase request.
+            task: The new request for the remote agent. The remote agent
+                remembers the earlier turns of this session, so only include
+                what changed since the last task sent to it.
             tool_context: The tool context this method runs in.
 
         Yields:
@@ -208,6 +369,9 @@ Current active seller agent: {current_agent["active_agent"]}
         send_response: SendMessageResponse = client.send_message(
             message_request=message_request
         )
+        self._record_usage(
+            state, agent_name, self._a2a_usage(send_response), "send_task"
+        )
         print(
             "send_response",
             send_response.model_dump_json(exclude_none=True, indent=2),
@@ -223,6 +387,151 @@ Current active seller agent: {current_agent["active_agent"]}
 
         return send_response.root.result
 
+    def _get_bigquery_client(self):
+        from google.cloud import bigquery
+
+        if self._bigquery_client is None:
+            self._bigquery_client = bigquery.Client(
+                project=os.getenv("GOOGLE_CLOUD_PROJECT")
+            )
+        return self._bigquery_client
+
+    def _estimate_query_bytes(self, query: str, project_id: str | None) -> int:
+        """Bytes `query` processes, from a dry run, which BigQuery doesn't bill."""
+        from google.api_core.exceptions import GoogleAPIError
+        from google.cloud import bigquery
+
+        try:
+            job = self._get_bigquery_client().query(
+                query,
+                job_config=bigquery.QueryJobConfig(dry_run=True),
+                project=project_id,
+            )
+        except GoogleAPIError as e:
+            print(f"Could not estimate BigQuery bytes processed: {e}")
+            return 0
+        return job.total_bytes_processed or 0
+
+    def _run_top_products_query(
+        self, limit: int, order_by: str
+    ) -> tuple[list[dict[str, Any]], int]:
+        from google.cloud import bigquery
+
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ScalarQueryParameter("limit", "INT64", limit)]
+        )
+        query = TOP_PRODUCTS_QUERY.format(table=ORDER_ITEMS_TABLE, order_by=order_by)
+        job = self._get_bigquery_client().query(query, job_config=job_config)
+        rows = [dict(row.items()) for row in job.result()]
+        return rows, job.total_bytes_processed or 0
+
+    def _find_agent_with_skill(self, skill_id: str) -> str | None:
+        for name, card in self.cards.items():
+            if any(skill.id == skill_id for skill in card.skills):
+                return name
+        return None
+
+    def _fetch_product_records(
+        self, agent_name: str, product_ids: list[str], session_id: str
+    ) -> tuple[dict[str, Any], Usage]:
+        """Fetches the seller's records for all product_ids in one A2A request."""
+        message_id = str(uuid.uuid4())
+        payload = {
+            "message": {
+                "role": "user",
+                "parts": [{"kind": "data", "data": {"product_ids": product_ids}}],
+                "messageId": message_id,
+                "contextId": session_id,
+            },
+        }
+        message_request = SendMessageRequest(
+            id=message_id, params=MessageSendParams.model_validate(payload)
+        )
+        send_response: SendMessageResponse = self.remote_agent_connections[
+            agent_name
+        ].send_message(message_request=message_request)
+        usage = self._a2a_usage(send_response)
+        if not isinstance(send_response.root, SendMessageSuccessResponse):
+            raise ValueError(f"Agent {agent_name} returned an error response")
+        task = send_response.root.result
+        if isinstance(task, Task):
+            for artifact in task.artifacts or []:
+                for part in artifact.parts:
+                    if isinstance(part.root, DataPart):
+                        return part.root.data, usage
+        raise ValueError(f"Agent {agent_name} returned no product records")
+
+    async def get_top_products_with_details(
+        self, limit: int, metric: str, tool_context: ToolContext
+    ):
+        """Gets the top products by order statistics joined with their product details
+
+        Runs one aggregate query over the order_items table, then fetches the
+        details of every resulting product from the seller agent in a single
+        batched request, and returns the joined table.
+
+        Args:
+            limit: The number of top products to return, between 1 and 50.
+            metric: How to rank products, either "orders" (number of distinct
+                orders) or "revenue" (total sale price).
+            tool_context: The tool context this method runs in.
+
+        Returns:
+            A dictionary with a `rows` list holding, per product, its rank,
+            product_id, order_count, revenue and the seller's product details.
+        """
+        if metric not in TOP_PRODUCTS_METRICS:
+            raise ValueError(
+                f"Unknown metric {metric}, expected one of {sorted(TOP_PRODUCTS_METRICS)}"
+            )
+        limit = max(1, min(int(limit), 50))
+        agent_name = self._find_agent_with_skill(PRODUCT_DETAILS_SKILL)
+        if agent_name is None:
+            raise ValueError(
+                f"No remote agent provides the {PRODUCT_DETAILS_SKILL} skill"
+            )
+        state = tool_context.state
+        state["active_agent"] = agent_name
+
+        stats, bytes_processed = await asyncio.to_thread(
+            self._run_top_products_query, limit, TOP_PRODUCTS_METRICS[metric]
+        )
+        self._record_usage(
+            state,
+            tool_context.agent_name,
+            Usage(bigquery_bytes_processed=bytes_processed),
+            "get_top_products_with_details",
+        )
+        product_ids = [str(row["product_id"]) for row in stats]
+        records = {}
+        if product_ids:
+            response, usage = await asyncio.to_thread(
+                self._fetch_product_records,
+                agent_name,
+                product_ids,
+                state["session_id"],
+            )
+            self._record_usage(state, agent_name, usage, "get_top_products_with_details")
+            records = {p["product_id"]: p for p in response.get("products", [])}
+
+        rows = []
+        for rank, (product_id, row) in enumerate(zip(product_ids, stats), start=1):
+            details = records.get(product_id)
+            rows.append(
+                {
+                    "rank": rank,
+                    "product_id": product_id,
+                    "order_count": row["order_count"],
+                    "revenue": row["revenue"],
+                    **(
+                        {k: v for k, v in details.items() if k != "product_id"}
+                        if details
+                        else {"details": "Not found in the seller's catalog"}
+                    ),
+                }
+            )
+        return {"metric": metric, "rows": rows}
+
 
 def convert_parts(parts: list[Part], tool_context: ToolContext):
     rval = []
@@ -1,3 +1,5 @@
+import gzip
+import threading
 from typing import Callable
 
 import httpx
@@ -21,6 +23,7 @@ from a2a.client.errors import (
     A2AClientTimeoutError,
 )
 from a2a.client.middleware import ClientCallContext
+from pydantic import ValidationError
 import requests
 
 load_dotenv()
@@ -28,6 +31,71 @@ load_dotenv()
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 
+# zstd is used when the optional `zstandard` package is installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Request bodies smaller than this are not worth compressing
+REQUEST_COMPRESSION_MIN_BYTES = 1024
+
+# Bytes sent and received on the wire by the last request made on the current
+# thread
+_payload_bytes = threading.local()
+
+
+def last_payload_bytes() -> tuple[int, int]:
+    """Returns the (request, response) body sizes of this thread's last request."""
+    return getattr(_payload_bytes, "sizes", (0, 0))
+
+
+def _encode_body(self, body: bytes) -> tuple[bytes, dict[str, str]]:
+    """Compresses a request body if the agent said it accepts compressed requests."""
+    headers = {"Content-Type": "application/json"}
+    accepted = getattr(self, "_request_encodings", set())
+    if len(body) >= REQUEST_COMPRESSION_MIN_BYTES:
+        if "zstd" in accepted and zstandard is not None:
+            body = zstandard.ZstdCompressor(level=3).compress(body)
+            headers["Content-Encoding"] = "zstd"
+        elif "gzip" in accepted:
+            # Same level as the seller uses for responses
+            body = gzip.compress(body, compresslevel=1)
+            headers["Content-Encoding"] = "gzip"
+    return body, headers
+
+
+def _post(self, body: bytes, http_kwargs: dict[str, Any] | None = None) -> bytes:
+    """Posts a serialized JSON-RPC request and returns the raw response body.
+
+    Responses are decompressed by requests, which advertises the codings it
+    can decode. Request bodies are only compressed once the agent has listed
+    the codings it accepts in the Accept-Encoding header of a response
+    (RFC 7694), so the first request to an agent is always sent as is.
+    """
+    body, headers = _encode_body(self, body)
+    http_kwargs = dict(http_kwargs or {})
+    headers = {**http_kwargs.pop("headers", {}), **headers}
+    try:
+        response = requests.post(self.url, data=body, headers=headers, **http_kwargs)
+        self._request_encodings = {
+            coding.strip().lower()
+            for coding in response.headers.get("Accept-Encoding", "").split(",")
+            if coding.strip()
+        }
+        _payload_bytes.sizes = (
+            len(body),
+            int(response.headers.get("Content-Length", len(response.content))),
+        )
+        response.raise_for_status()
+        return response.content
+    except requests.exceptions.Timeout as e:
+        raise A2AClientTimeoutError("Client Request timed out") from e
+    except requests.exceptions.HTTPError as e:
+        raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+    except requests.exceptions.RequestException as e:
+        raise A2AClientHTTPError(503, f"Network communication error: {e}") from e
+
 
 def _send_request(
     self,
@@ -48,20 +116,11 @@ def _send_request(
         A2AClientHTTPError: If an HTTP error occurs during the request.
         A2AClientJSONError: If the response body cannot be decoded as JSON.
     """
+    body = json.dumps(rpc_request_payload).encode("utf-8")
     try:
-        response = requests.post(
-            self.url, json=rpc_request_payload, **(http_kwargs or {})
-        )
-        response.raise_for_status()
-        return response.json()
-    except httpx.ReadTimeout as e:
-        raise A2AClientTimeoutError("Client Request timed out") from e
-    except httpx.HTTPStatusError as e:
-        raise A2AClientHTTPError(e.response.status_code, str(e)) from e
+        return json.loads(_post(self, body, http_kwargs))
     except json.JSONDecodeError as e:
         raise A2AClientJSONError(str(e)) from e
-    except httpx.RequestError as e:
-        raise A2AClientHTTPError(503, f"Network communication error: {e}") from e
 
 
 def send_message(
@@ -73,10 +132,15 @@ def send_message(
 ) -> SendMessageResponse:
     """Sends a non-streaming message request to the agent.
 
+    The request is serialized by pydantic-core in one pass, without building
+    an intermediate dict. Responses are still parsed with json.loads:
+    `model_validate_json` is slower on the A2A union types than parsing
+    first and validating the resulting dict.
+
     Args:
         request: The `SendMessageRequest` object containing the message and configuration.
         http_kwargs: Optional dictionary of keyword arguments to pass to the
-            underlying httpx.post request.
+            underlying requests.post call.
         context: The client call context.
 
     Returns:
@@ -89,10 +153,13 @@ def send_message(
     if not request.id:
         request.id = str(uuid4())
 
-    response_data = self._send_request(
-        request.model_dump(mode="json", exclude_none=True), http_kwargs
+    response_body = _post(
+        self, request.model_dump_json(exclude_none=True).encode("utf-8"), http_kwargs
     )
-    return SendMessageResponse.model_validate(response_data)
+    try:
+        return SendMessageResponse.model_validate(json.loads(response_body))
+    except (json.JSONDecodeError, ValidationError) as e:
+        raise A2AClientJSONError(str(e)) from e
 
 
 class RemoteAgentConnections:
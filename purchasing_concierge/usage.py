@@ -0,0 +1,101 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+
+@dataclass
+class Usage:
+    """Token, latency and data volume spent on a request, or a roll-up of several."""
+
+    model_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    model_latency_s: float = 0.0
+    bigquery_bytes_processed: int = 0
+    a2a_requests: int = 0
+    a2a_request_bytes: int = 0
+    a2a_response_bytes: int = 0
+
+    def add(self, other: "Usage") -> None:
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    def as_dict(self) -> dict[str, Any]:
+        usage = asdict(self)
+        usage["model_latency_s"] = round(self.model_latency_s, 3)
+        return usage
+
+    @classmethod
+    def from_dict(cls, usage: dict[str, Any]) -> "Usage":
+        names = {field.name for field in fields(cls)}
+        return cls(**{k: v for k, v in usage.items() if k in names})
+
+
+def remote_usage(artifact_metadata: dict[str, Any] | None) -> Usage:
+    """Reads the LLM usage a remote agent reported in its artifact metadata."""
+    usage = (artifact_metadata or {}).get("usage") or {}
+    return Usage(
+        model_calls=usage.get("llm_calls", 0),
+        prompt_tokens=usage.get("prompt_tokens", 0),
+        completion_tokens=usage.get("completion_tokens", 0),
+        model_latency_s=usage.get("model_latency_s", 0.0),
+    )
+
+
+class UsageLedger:
+    """Rolls usage up per session, per agent and per tool, for the local report.
+
+    Agents are the concierge itself (Gemini and BigQuery) and each remote
+    agent (its reported LLM usage and the A2A traffic to it). Tools are the
+    concierge tools that spent the usage; model calls belong to no tool.
+    Process-local and bounded: the `max_sessions` most recently active
+    sessions are kept, while agents and tools are fixed sets. The per-session
+    totals are also kept in the session state.
+
+    Only used from the event loop, and holds no lock so that the agent stays
+    picklable for deployment to Agent Engine.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, Usage] = OrderedDict()
+        self._agents: dict[str, Usage] = {}
+        self._tools: dict[str, Usage] = {}
+
+    def record(
+        self, session_id: str, agent_name: str, usage: Usage, tool_name: str | None = None
+    ) -> None:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = Usage()
+        else:
+            self._sessions.move_to_end(session_id)
+        session.add(usage)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        self._agents.setdefault(agent_name, Usage()).add(usage)
+        if tool_name is not None:
+            self._tools.setdefault(tool_name, Usage()).add(usage)
+
+    def report(self) -> dict[str, Any]:
+        return {
+            "sessions": {k: v.as_dict() for k, v in self._sessions.items()},
+            "agents": {k: v.as_dict() for k, v in self._agents.items()},
+            "tools": {k: v.as_dict() for k, v in self._tools.items()},
+        }
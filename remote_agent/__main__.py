@@ -14,16 +14,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-from a2a.types import AgentCapabilities, AgentSkill, AgentCard
-from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.apps import A2AStarletteApplication
-from a2a.server.tasks import InMemoryTaskStore
-from agent import ProductSellerAgent
-from agent_executor import ProductSellerAgentExecutor
-import uvicorn
-from dotenv import load_dotenv
 import logging
 import os
+import shutil
+import tempfile
+
+from agent import CATALOG
+from catalog import ProductCatalog
+from server import create_app
+import uvicorn
+from dotenv import load_dotenv
 import click
 
 load_dotenv()
@@ -32,21 +32,23 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def publish_shared_catalog(shared_dir: str, catalog_path: str) -> None:
+    """Publishes the memory-mapped catalog snapshot before workers start.
+
+    Workers then map the published snapshot instead of each parsing the
+    catalog file.
+    """
+    snapshot = ProductCatalog(catalog_path, os.path.join(shared_dir, "catalog")).reload()
+    logger.info(f"Published shared catalog snapshot {snapshot.version}")
+
+
 @click.command()
 @click.option("--host", "host", default="0.0.0.0")
 @click.option("--port", "port", default=10001)
-def main(host, port):
+@click.option("--workers", "workers", default=1, type=int)
+def main(host, port, workers):
     """Entry point for the A2A + CrewAI Product Seller Agent."""
     try:
-        capabilities = AgentCapabilities(streaming=True)
-        skill = AgentSkill(
-            id="get_product_details",
-            name="Product Details Lookup Tool",
-            description="Retrieves product details using a product ID from static inventory.",
-            tags=["product lookup", "inventory"],
-            examples=["What are the details for product 27837?"],
-        )
-        
         # --- CHANGE: Simplified and clarified how the public URL is determined ---
         # When deploying to Azure, set the AGENT_BASE_URL environment variable 
         # to the public URL of your Container App.
@@ -54,29 +56,35 @@ def main(host, port):
         if not agent_base_url:
             agent_base_url = f"http://{host}:{port}"
             logger.warning(f"AGENT_BASE_URL not set, defaulting to local URL: {agent_base_url}")
-        
-        agent_card = AgentCard(
-            name="product_seller_agent",
-            description="Provides product details based on a product ID.",
-            url=agent_base_url, 
-            version="1.0.0",
-            # Use the SUPPORTED_CONTENT_TYPES from the new agent class
-            defaultInputModes=ProductSellerAgent.SUPPORTED_CONTENT_TYPES, 
-            defaultOutputModes=ProductSellerAgent.SUPPORTED_CONTENT_TYPES,
-            capabilities=capabilities,
-            skills=[skill],
-        )
-
-        request_handler = DefaultRequestHandler(
-            agent_executor=ProductSellerAgentExecutor(),
-            task_store=InMemoryTaskStore(),
-        )
-        server = A2AStarletteApplication(
-            agent_card=agent_card, http_handler=request_handler
-        )
-
-        logger.info(f"Starting server on {host}:{port}, advertising public URL: {agent_base_url}")
-        uvicorn.run(server.build(), host=host, port=port)
+            os.environ["AGENT_BASE_URL"] = agent_base_url
+
+        if workers > 1:
+            # Worker processes inherit the environment, which is how they find
+            # the shared catalog snapshot, task store and conversation memory
+            # in SELLER_SHARED_DIR.
+            temporary_dir = None
+            if not os.getenv("SELLER_SHARED_DIR"):
+                temporary_dir = tempfile.mkdtemp(prefix="product-seller-")
+                os.environ["SELLER_SHARED_DIR"] = temporary_dir
+            # Workers pick up a catalog reloaded by any one of them this way
+            os.environ.setdefault("CATALOG_WATCH_INTERVAL", "5")
+            shared_dir = os.environ["SELLER_SHARED_DIR"]
+            os.makedirs(shared_dir, exist_ok=True)
+            publish_shared_catalog(shared_dir, CATALOG.path)
+            logger.info(f"Serving product catalog from {CATALOG.path}")
+            logger.info(f"Starting {workers} workers on {host}:{port} sharing {shared_dir}, advertising public URL: {agent_base_url}")
+            try:
+                uvicorn.run(
+                    "server:create_app", factory=True, host=host, port=port, workers=workers
+                )
+            finally:
+                if temporary_dir is not None:
+                    shutil.rmtree(temporary_dir, ignore_errors=True)
+        else:
+            app = create_app()
+            logger.info(f"Serving product catalog from {CATALOG.path}")
+            logger.info(f"Starting server on {host}:{port}, advertising public URL: {agent_base_url}")
+            uvicorn.run(app, host=host, port=port)
 
     except Exception as e:
         logger.error(f"An error occurred during server startup: {e}")
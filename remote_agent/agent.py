@@ -16,30 +16,33 @@ limitations under the License.
 
 from pydantic import BaseModel
 import json
+import threading
 import uuid
-from crewai import Agent, Crew, Task, Process, LLM
-from crewai.tools import tool
 from dotenv import load_dotenv
-import litellm
 import os
+from catalog import ProductCatalog
+from conversation import Turn, format_history
+
+# NOTE: crewai (and litellm underneath it) is imported lazily in
+# ProductSellerAgent so that the A2A server can come up and serve its agent
+# card before the heavy LLM stack has finished loading.
 
 # --- Configuration ---
 load_dotenv()
 
-# --- Static Data Source ---
-STATIC_PRODUCTS_JSON = """
-[{"product_id": "27837", "cost": "14.22500004991889", "category": "Swim", "name": "Beach Rays Men\u0027s Cargo Pocket Boardshort", "brand": "Beach Rays", "retail_price": "25.0", "department": "Men", "sku": "AF1A4EA496C2D7D01D9D1EBD8D5C82F4", "distribution_center_id": "6"}, 
-{"product_id": "25930", "cost": "12.649999978020787", "category": "Underwear", "name": "Hanes Men\u0027s 3 Pack Comfortblend Short Leg Boxer Brief", "brand": "Hanes", "retail_price": "25.0", "department": "Men", "sku": "F21C444A5DD33EEA45CE16801C289D23", "distribution_center_id": "3"}, 
-{"product_id": "28953", "cost": "7.4298698834899071", "category": "Accessories", "name": "100% Silk Woven Gold Plaid Self-Tie Bow Tie", "brand": "TheTieBar", "retail_price": "17.989999771118164", "department": "Men", "sku": "7B889DA86FA368B083E6B41F1C879FA9", "distribution_center_id": "7"}, 
-{"product_id": "24316", "cost": "31.156109792127609", "category": "Outerwear \u0026 Coats", "name": "Dickies - Fleece-Lined Hooded Nylon Jacket", "brand": "Dickies", "retail_price": "69.389999389648438", "department": "Men", "sku": "70A3E3E59BC61C8EB7ACFBBA1073980C", "distribution_center_id": "1"}, 
-{"product_id": "20309", "cost": "7.32914969935119", "category": "Suits \u0026 Sport Coats", "name": "Allegra K Mens Stylish Solid Color Small Pocket Upper Button Closure Fall Blazer Gray S", "brand": "Allegra K", "retail_price": "16.469999313354492", "department": "Men", "sku": "B05F00551528BDA221276D01A40B7EF2", "distribution_center_id": "9"}, 
-{"product_id": "12638", "cost": "4.4284999975934634", "category": "Intimates", "name": "Fashion Forms Low Back Straps", "brand": "Fashion Forms", "retail_price": "8.5", "department": "Women", "sku": "195D221C982E47EB58347E5D06CE3180", "distribution_center_id": "10"}, 
-{"product_id": "4568", "cost": "96.668000105768442", "category": "Jeans", "name": "Joe\u0027s Jeans Women\u0027s Yasmin Skinny Jean", "brand": "Joe\u0027s Jeans", "retail_price": "169.0", "department": "Women", "sku": "BCFA8A783AAF938CDEF361634D5F9289", "distribution_center_id": "6"}, 
-{"product_id": "24631", "cost": "5.8500000182539225", "category": "Socks", "name": "K. Bell Socks Men\u0027s Wide Mouth Shark", "brand": "K. Bell", "retail_price": "10.0", "department": "Men", "sku": "EB3CEE21198139FA6A21866D764CC4B8", "distribution_center_id": "5"}, 
-{"product_id": "5433", "cost": "11.640959460911304", "category": "Pants \u0026 Capris", "name": "BKE Women\u0027s Casual Linen Cotton Natural Comfortable Pants", "brand": "BKE", "retail_price": "20.209999084472656", "department": "Women", "sku": "BF25356FD2A6E038F1A3A59C26687E80", "distribution_center_id": "1"}, 
-{"product_id": "23456", "cost": "41.118000108748674", "category": "Shorts", "name": "Jet Lag Men\u0027s Take Off 3 Cargo Shorts", "brand": "Jet Lag", "retail_price": "89.0", "department": "Men", "sku": "ADCAEC3805AA912C0D0B14A81BEDB6FF", "distribution_center_id": "6"}]
-"""
-STATIC_PRODUCTS = json.loads(STATIC_PRODUCTS_JSON)
+# --- Product Catalog ---
+# Loaded from CATALOG_PATH (JSONL, JSON, CSV or Parquet) and hot-reloadable,
+# see catalog.ProductCatalog. Defaults to the inventory bundled with the agent.
+# Worker processes share one memory-mapped copy through SELLER_SHARED_DIR.
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "products.jsonl")
+CATALOG = ProductCatalog(
+    os.getenv("CATALOG_PATH", DEFAULT_CATALOG_PATH),
+    shared_dir=(
+        os.path.join(os.environ["SELLER_SHARED_DIR"], "catalog")
+        if os.getenv("SELLER_SHARED_DIR")
+        else None
+    ),
+)
 
 # --- Data Models for the Tool ---
 class Product(BaseModel):
@@ -54,91 +57,207 @@ class Product(BaseModel):
     distribution_center_id: str
 
 
-# --- Agent Tool Definition ---
-@tool("get_product_details")
+# --- Agent Tool Definitions ---
+# Wrapped into crewai tools when the crew agent is built, see ProductSellerAgent
+def _format_product(product_data) -> dict:
+    # Convert float strings to float for calculation, then format the output
+    cost = float(product_data.get("cost", 0))
+    retail_price = float(product_data.get("retail_price", 0))
+    return {
+        "product_id": product_data.get("product_id"),
+        "name": product_data.get("name"),
+        "brand": product_data.get("brand"),
+        "category": product_data.get("category"),
+        "department": product_data.get("department"),
+        "retail_price": f"${retail_price:.2f}",
+        "cost": f"${cost:.2f}",
+        "sku": product_data.get("sku"),
+    }
+
+
 def get_product_details(product_id: str) -> str:
     """
-    Retrieves detailed information for a product using its ID from the static data source.
+    Retrieves detailed information for a product using its ID from the product catalog.
     Returns a JSON string of the product details or an error message if not found.
     """
     try:
-        # Search the static list for the product_id
-        product_data = next((p for p in STATIC_PRODUCTS if p["product_id"] == product_id), None)
+        product_data = CATALOG.snapshot.get(product_id)
         
         if product_data:
-            # Convert float strings to float for calculation, then format the output
-            cost = float(product_data.get("cost", 0))
-            retail_price = float(product_data.get("retail_price", 0))
-            
             # Format the output for the LLM
-            return json.dumps({
-                "product_id": product_data.get("product_id"),
-                "name": product_data.get("name"),
-                "brand": product_data.get("brand"),
-                "category": product_data.get("category"),
-                "department": product_data.get("department"),
-                "retail_price": f"${retail_price:.2f}",
-                "cost": f"${cost:.2f}",
-                "sku": product_data.get("sku"),
-            }, indent=2)
+            return json.dumps(_format_product(product_data), separators=(",", ":"))
         else:
-            return f"Product with ID {product_id} not found in the static inventory."
+            return f"Product with ID {product_id} not found in the product catalog."
     except Exception as e:
         print(f"Error retrieving product details: {e}")
         return f"Error retrieving product details: {e}"
 
 
+def get_product_records(product_ids: list[str]) -> dict:
+    """
+    Looks up several products at once for structured callers, without going
+    through the LLM. Unknown IDs are reported under `missing`.
+    """
+    snapshot = CATALOG.snapshot
+    products, missing = [], []
+    for product_id in product_ids:
+        product_data = snapshot.get(str(product_id))
+        if product_data:
+            products.append(_format_product(product_data))
+        else:
+            missing.append(str(product_id))
+    return {
+        "catalog_version": snapshot.version,
+        "products": products,
+        "missing": missing,
+    }
+
+
+def search_products(
+    query: str = "",
+    brand: str = "",
+    category: str = "",
+    department: str = "",
+    min_price: float | None = None,
+    max_price: float | None = None,
+    limit: int = 10,
+) -> str:
+    """
+    Searches the product catalog by free text (matched against product name, brand, category and department)
+    and optional exact filters on brand, category and department plus a retail price range.
+    Products must contain every word of `query`, so pass only the descriptive words (e.g. "cargo shorts").
+    Returns a JSON list of at most `limit` matching products, cheapest first, or a message if nothing matches.
+    """
+    try:
+        results = CATALOG.snapshot.index.search(
+            text=query,
+            brand=brand,
+            category=category,
+            department=department,
+            min_price=min_price,
+            max_price=max_price,
+            limit=max(1, min(int(limit), 50)),
+        )
+        if not results:
+            return "No products in the product catalog match the search."
+        return json.dumps([
+            {
+                "product_id": p.get("product_id"),
+                "name": p.get("name"),
+                "brand": p.get("brand"),
+                "category": p.get("category"),
+                "department": p.get("department"),
+                "retail_price": f"${float(p.get('retail_price') or 0):.2f}",
+            }
+            for p in results
+        ], separators=(",", ":"))
+    except Exception as e:
+        print(f"Error searching products: {e}")
+        return f"Error searching products: {e}"
+
+
 # --- The Agent Logic ---
 class ProductSellerAgent:
     TaskInstruction = """
 # INSTRUCTIONS
-You are an expert **Product Seller Agent**. Your goal is to provide detailed information about products when given a specific product ID.
+You are an expert **Product Seller Agent**. Your goal is to provide detailed information about products when given a specific product ID, and to help find products in the catalog.
 
 # CONTEXT
+Conversation so far in this session:
+{conversation_history}
+
 Received user query: {user_prompt}
 Session ID: {session_id}
 
 # RULES
 - **Primary Function:** Use the `get_product_details` tool to look up product information whenever the user asks about a product and provides a specific product ID (e.g., "What is the price of product 27837?").
+- **Search:** Use the `search_products` tool when the user is browsing or looking for products without a specific product ID (e.g., "Show me men's shorts under $50" or "What Hanes products do you have?"). Pass descriptive words as `query` and use the `brand`, `category`, `department`, `min_price` and `max_price` filters whenever the user states them.
+- **Follow-ups:** The received query may only contain what is new since the previous turn. Resolve references such as "it" or "the cheaper one" against the conversation so far.
 - **Response:** Provide a helpful, concise summary of the product's details, including its name, category, brand, and retail price.
 - **Unavailable Product:** If the product is not found via the tool, inform the user that the product ID is invalid or not in stock.
-- **Irrelevant Query:** If the user's query is not about finding product details by ID, politely state that you can only assist with product lookups using a product ID.
+- **Irrelevant Query:** If the user's query is not about looking up or searching for products, politely state that you can only assist with product lookups and product search.
 """
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
     
+    @property
+    def catalog_version(self) -> str:
+        """Version of the product catalog the agent is answering from."""
+        return CATALOG.version
+
     def __init__(self):
+        # Bounds the conversation history rendered into each prompt
+        self.max_history_chars = int(os.getenv("SELLER_MAX_HISTORY_CHARS", "1500"))
+        self._llm_and_tools = None
+        self._build_lock = threading.Lock()
+
+    def _get_llm_and_tools(self):
+        """The LLM and tool wrappers, built once and shared by every request."""
+        if self._llm_and_tools is None:
+            with self._build_lock:
+                if self._llm_and_tools is None:
+                    self._llm_and_tools = self._build_llm_and_tools()
+        return self._llm_and_tools
+
+    def warm_up(self) -> None:
+        """Loads the catalog and crewai ahead of the first request."""
+        _ = CATALOG.snapshot
+        self._build_product_agent()
+
+    def _build_llm_and_tools(self):
+        from crewai import LLM
+        from crewai.tools import tool
+
         print("--- Azure Environment Variables ---")
         print(f"AZURE_API_KEY: {os.environ.get('AZURE_API_KEY')}")
         print(f"AZURE_API_BASE: {os.environ.get('AZURE_API_BASE')}")
         print(f"AZURE_API_VERSION: {os.environ.get('AZURE_API_VERSION')}")
         print("---------------------------------")
 
-        model = litellm.completion
-        
-        self.product_agent = Agent(
+        llm = LLM(model="azure/gpt-4.1") #add model information from the agent created in AI Foundry
+        tools = [
+            tool("get_product_details")(get_product_details),
+            tool("search_products")(search_products),
+        ]
+        print("Product Seller Agent initialized for Azure OpenAI.")
+        return llm, tools
+
+    def _build_product_agent(self):
+        # A fresh crewai Agent per request: crewai keeps per-run state on the
+        # agent (its executor, crew and token counts), so requests running
+        # concurrently must not share one.
+        from crewai import Agent
+
+        llm, tools = self._get_llm_and_tools()
+        return Agent(
             role="Product Seller Agent",
-            goal="Provide product details when prompted with a product ID.",
+            goal="Provide product details when prompted with a product ID and help find products in the catalog.",
             backstory="You are a specialized agent providing product lookup services.",
             verbose=True,
             allow_delegation=False,
-            tools=[get_product_details],
-            llm=LLM(model="azure/gpt-4.1") #add model information from the agent created in AI Foundry
+            tools=tools,
+            llm=llm,
         )
-        print("Product Seller Agent initialized for Azure OpenAI.")
 
-    def invoke(self, query: str, session_id: str) -> str:
+    def invoke(self, query: str, session_id: str, history: tuple[Turn, ...] = ()) -> str:
+        from crewai import Crew, Task, Process
+
+        product_agent = self._build_product_agent()
         agent_task = Task(
             description=self.TaskInstruction,
-            agent=self.product_agent,
-            expected_output="A helpful response to the user, either answering a question or asking for the product ID.",
+            agent=product_agent,
+            expected_output="A helpful response to the user, either answering a question, listing matching products or asking for the product ID.",
         )
         crew = Crew(
             tasks=[agent_task],
-            agents=[self.product_agent],
+            agents=[product_agent],
             verbose=True,
             process=Process.sequential,
         )
 
-        inputs = {"user_prompt": query, "session_id": session_id}
+        inputs = {
+            "user_prompt": query,
+            "session_id": session_id,
+            "conversation_history": format_history(history, self.max_history_chars),
+        }
         response = crew.kickoff(inputs=inputs)
         return response
@@ -14,9 +14,16 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
+import asyncio
+import json
+import os
+import time
+from typing import Any
+
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
 from a2a.types import (
+    DataPart,
     Part,
     Task,
     TextPart,
@@ -27,31 +34,147 @@ from a2a.utils import (
     new_artifact,
 )
 from a2a.utils.errors import ServerError
-from agent import ProductSellerAgent
+from agent import CATALOG, ProductSellerAgent, get_product_records
+from conversation import (
+    ConversationStore,
+    SqliteConversationStore,
+    Turn,
+    compact_response,
+)
+from usage import Usage, UsageLedger, crew_usage
+
+
+def _get_product_ids_request(context: RequestContext) -> list[str] | None:
+    """Returns the product IDs of a structured batch lookup, if this is one.
+
+    Callers that only need catalog records (e.g. to join them with their own
+    data) send a data part `{"product_ids": [...]}`, which is answered straight
+    from the catalog without running the crew.
+    """
+    if context.message is None:
+        return None
+    for part in context.message.parts:
+        if isinstance(part.root, DataPart) and "product_ids" in part.root.data:
+            return list(part.root.data["product_ids"])
+    return None
+
+
+def _normalize_query(query: str) -> str:
+    """Normalizes a user query so trivially different phrasings share a key."""
+    return " ".join(query.split()).casefold()
 
 
 class ProductSellerAgentExecutor(AgentExecutor):
-    """Product Seller AgentExecutor."""
+    """Product Seller AgentExecutor.
+
+    Earlier turns are remembered per contextId, so callers only send what is
+    new on each turn. Answers are remembered in compact form, their start and
+    the product IDs they mention, to keep later prompts small. Concurrent requests carrying the same normalized query
+    and conversation history against the same catalog version are coalesced
+    into a single in-flight crew run; every caller still gets its own task
+    and artifact. Each artifact carries the request's LLM usage and the
+    session's running totals in its metadata.
+    """
 
     def __init__(self):
         self.agent = ProductSellerAgent()
+        max_contexts = int(os.getenv("SELLER_MAX_CONTEXTS", "1000"))
+        max_turns = int(os.getenv("SELLER_MAX_TURNS", "10"))
+        # Set when running several workers, see __main__.py
+        shared_dir = os.getenv("SELLER_SHARED_DIR")
+        if shared_dir:
+            self.conversations = SqliteConversationStore(
+                os.path.join(shared_dir, "conversations.db"), max_contexts, max_turns
+            )
+        else:
+            self.conversations = ConversationStore(max_contexts, max_turns)
+        self.usage = UsageLedger(max_sessions=max_contexts)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    def _run_crew(
+        self, query: str, session_id: str, history: tuple[Turn, ...]
+    ) -> tuple[Any, Usage]:
+        started = time.perf_counter()
+        result = self.agent.invoke(query, session_id, history)
+        return result, crew_usage(result, time.perf_counter() - started)
+
+    async def _invoke_coalesced(
+        self, query: str, session_id: str, history: tuple[Turn, ...]
+    ) -> tuple[Any, Usage]:
+        """Returns the crew result and the usage to account to this caller.
+
+        Callers that attached to another request's run share its result but
+        not its cost, so LLM usage is only counted once.
+        """
+        key = (_normalize_query(query), self.agent.catalog_version, history)
+        future = self._inflight.get(key)
+        coalesced = future is not None
+        if future is None:
+            # Run the blocking crew off the event loop so that identical
+            # requests arriving meanwhile can attach to this future.
+            future = asyncio.ensure_future(
+                asyncio.to_thread(self._run_crew, query, session_id, history)
+            )
+            self._inflight[key] = future
+
+            def _release(done: asyncio.Future) -> None:
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+
+            future.add_done_callback(_release)
+        else:
+            print(f"Coalescing request with in-flight query: {key[0]!r}")
+        # Shield so that one caller being cancelled doesn't cancel the others
+        result, usage = await asyncio.shield(future)
+        if coalesced:
+            usage = Usage(requests=1, coalesced_requests=1)
+        return result, usage
 
     async def execute(
         self,
         context: RequestContext,
         event_queue: EventQueue,
     ) -> None:
+        product_ids = _get_product_ids_request(context)
         query = context.get_user_input()
         try:
-            result = self.agent.invoke(query, context.context_id)
-            print(f"Final Result ===> {result}")
+            if product_ids is not None:
+                records = get_product_records(product_ids)
+                parts = [Part(root=DataPart(data=records))]
+                usage = Usage(
+                    requests=1, response_bytes=len(json.dumps(records).encode("utf-8"))
+                )
+            else:
+                # The SQLite store may wait on other workers' writes, so keep
+                # its calls off the event loop
+                history = await asyncio.to_thread(
+                    self.conversations.history, context.context_id
+                )
+                result, usage = await self._invoke_coalesced(
+                    query, context.context_id, history
+                )
+                print(f"Final Result ===> {result}")
+                await asyncio.to_thread(
+                    self.conversations.append,
+                    context.context_id,
+                    query,
+                    compact_response(str(result), CATALOG.snapshot.products),
+                )
+                parts = [Part(root=TextPart(text=str(result)))]
+                usage.response_bytes = len(str(result).encode("utf-8"))
 
-            parts = [Part(root=TextPart(text=str(result)))]
+            session_usage = self.usage.record(context.context_id, usage)
+            print(f"Usage ===> {usage.as_dict()}")
+            artifact = new_artifact(parts, f"product_{context.task_id}")
+            artifact.metadata = {
+                "usage": usage.as_dict(),
+                "session_usage": session_usage.as_dict(),
+            }
             await event_queue.enqueue_event(
                 completed_task(
                     context.task_id,
                     context.context_id,
-                    [new_artifact(parts, f"product_{context.task_id}")],
+                    [artifact],
                     [context.message],
                 )
             )
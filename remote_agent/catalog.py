@@ -0,0 +1,711 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import bisect
+import contextlib
+import csv
+import fcntl
+import glob
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any, BinaryIO, Callable, Iterable, Iterator, Mapping, Sequence
+
+# Low cardinality fields whose strings are interned, so that the millions of
+# rows in a large catalog (and the old and new snapshot during a reload)
+# share a single copy of each value.
+INTERNED_FIELDS = ("category", "brand", "department", "distribution_center_id")
+
+
+# Fields whose words are searchable with free text
+SEARCHABLE_FIELDS = ("name", "brand", "category", "department")
+# Fields that can be filtered on with an exact (case-insensitive) match
+FACET_FIELDS = ("brand", "category", "department")
+
+_TOKEN_RE = re.compile(r"[0-9a-z]+")
+# Possessives are folded into their word, "men's" matches "men"
+_POSSESSIVE_RE = re.compile(r"['\u2019]s\b")
+# Words too common to tell products apart
+STOPWORDS = frozenset(
+    "a an and any are at by do for from have i in is me of on or show some "
+    "the to what with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in _TOKEN_RE.findall(_POSSESSIVE_RE.sub("", text.casefold()))
+        if (len(token) > 1 or token.isdigit()) and token not in STOPWORDS
+    ]
+
+
+def _price(product: Mapping[str, str]) -> float:
+    try:
+        return float(product.get("retail_price") or 0)
+    except ValueError:
+        return 0.0
+
+
+def _facet_key(field: str, value: str) -> str:
+    return f"{field}:{value.casefold()}"
+
+
+def _contains(positions: Sequence[int], position: int) -> bool:
+    i = bisect.bisect_left(positions, position)
+    return i < len(positions) and positions[i] == position
+
+
+# Positions are uint32 record numbers; prices are float64
+IndexTables = tuple[array, array, dict[str, array], dict[str, array]]
+
+
+def build_index_tables(records: Iterable[Mapping[str, str]]) -> IndexTables:
+    """Builds the search tables over records numbered 0, 1, 2...
+
+    Returns the price of each record, the record numbers in price order, and
+    the sorted record numbers per searchable word and per facet value.
+    """
+    prices = array("d")
+    postings: dict[str, array] = {}
+    facets: dict[str, array] = {}
+    for position, product in enumerate(records):
+        tokens = set()
+        for field in SEARCHABLE_FIELDS:
+            tokens.update(tokenize(product.get(field, "")))
+        for token in tokens:
+            postings.setdefault(token, array("I")).append(position)
+        for field in FACET_FIELDS:
+            key = _facet_key(field, product.get(field, ""))
+            facets.setdefault(key, array("I")).append(position)
+        prices.append(_price(product))
+    # Stable sort, so equal prices stay in record order
+    price_order = array("I", sorted(range(len(prices)), key=prices.__getitem__))
+    return prices, price_order, postings, facets
+
+
+class ProductIndex:
+    """Inverted index and price order over one catalog snapshot.
+
+    Everything is keyed on record numbers rather than product ID strings, so
+    the tables are flat integer arrays. In memory they are built per
+    snapshot; for shared snapshots they are written to the snapshot file
+    and every process reads the same memory-mapped copy. Read-only, so safe
+    to query from any thread.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[Mapping[str, str]],
+        prices: Sequence[float],
+        price_order: Sequence[int],
+        postings: Mapping[str, Sequence[int]],
+        facets: Mapping[str, Sequence[int]],
+    ):
+        self._records = records
+        self._prices = prices
+        self._price_order = price_order
+        self._postings = postings
+        self._facets = facets
+
+    def search(
+        self,
+        text: str = "",
+        brand: str = "",
+        category: str = "",
+        department: str = "",
+        min_price: float | None = None,
+        max_price: float | None = None,
+        limit: int = 10,
+    ) -> list[Mapping[str, str]]:
+        """Returns the top `limit` products matching the text and filters.
+
+        With text, products must contain every query word, with or without
+        filters. Matches are ordered by ascending price.
+        """
+        required: list[Sequence[int]] = []
+        for field, value in (("brand", brand), ("category", category), ("department", department)):
+            if value:
+                required.append(self._facets.get(_facet_key(field, value), ()))
+        tokens = set(tokenize(text))
+        for token in tokens:
+            required.append(self._postings.get(token, ()))
+        required.sort(key=len)
+
+        prices = self._prices
+        low = float("-inf") if min_price is None else min_price
+        high = float("inf") if max_price is None else max_price
+        start = bisect.bisect_left(self._price_order, low, key=prices.__getitem__)
+        end = bisect.bisect_right(self._price_order, high, key=prices.__getitem__)
+
+        if required and (tokens or len(required[0]) < end - start):
+            # Rank the records of the rarest word or facet value that match
+            # everything else
+            smallest, others = required[0], required[1:]
+            top = heapq.nsmallest(
+                limit,
+                (
+                    position
+                    for position in smallest
+                    if low <= prices[position] <= high
+                    and all(_contains(other, position) for other in others)
+                ),
+                key=lambda position: (prices[position], position),
+            )
+        else:
+            # Walk the records in price order, from the start of the price
+            # range, until enough of them pass the filters
+            top = []
+            for i in range(start, end):
+                position = self._price_order[i]
+                if all(_contains(other, position) for other in required):
+                    top.append(position)
+                    if len(top) == limit:
+                        break
+        return [self._records[position] for position in top]
+
+
+@dataclass(frozen=True)
+class CatalogSnapshot:
+    """An immutable, versioned view of the product catalog.
+
+    Snapshots are never modified once built; a reload builds a new snapshot
+    and swaps it in, so readers holding a reference keep a consistent view.
+    The product records themselves must be treated as read-only.
+    """
+
+    version: str
+    source: str
+    products: Mapping[str, Mapping[str, str]]
+    index: ProductIndex
+
+    def get(self, product_id: str) -> Mapping[str, str] | None:
+        return self.products.get(product_id)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+
+class _HashingReader(io.RawIOBase):
+    """Raw binary reader that hashes the bytes as the parser reads them.
+
+    The catalog version is then the hash of exactly the bytes that were
+    parsed, even if the file is rewritten in place during a load.
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self._digest = hashlib.sha256()
+        self._version: str | None = None
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self.file.readinto(buffer)
+        if n and self._version is None:
+            self._digest.update(memoryview(buffer)[:n])
+        return n
+
+    def version(self) -> str:
+        """Hashes whatever the parser left unread and returns the content hash."""
+        if self._version is None:
+            for chunk in iter(lambda: self.file.read(1 << 20), b""):
+                self._digest.update(chunk)
+            self._version = self._digest.hexdigest()[:12]
+        return self._version
+
+
+def _text(source: _HashingReader, **kwargs) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BufferedReader(source, 1 << 20), encoding="utf-8", **kwargs)
+
+
+def _iter_jsonl(source: _HashingReader) -> Iterator[dict[str, Any]]:
+    for line in io.BufferedReader(source, 1 << 20):
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_json(source: _HashingReader) -> Iterator[dict[str, Any]]:
+    yield from json.load(_text(source))
+
+
+def _iter_csv(source: _HashingReader) -> Iterator[dict[str, Any]]:
+    yield from csv.DictReader(_text(source, newline=""))
+
+
+def _iter_parquet(source: _HashingReader) -> Iterator[dict[str, Any]]:
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ValueError("Reading Parquet catalogs requires pyarrow") from e
+
+    # pyarrow reads by seeking around the file, so hash it in one pass first.
+    # Both passes go through the same open file, so a catalog replaced by
+    # renaming a new file over it can't be mixed up.
+    source.version()
+    source.file.seek(0)
+    for batch in pq.ParquetFile(source.file).iter_batches():
+        yield from batch.to_pylist()
+
+
+READERS = {
+    ".jsonl": _iter_jsonl,
+    ".json": _iter_json,
+    ".csv": _iter_csv,
+    ".parquet": _iter_parquet,
+}
+
+
+def _compact(record: dict[str, Any]) -> dict[str, str]:
+    product = {k: "" if v is None else str(v) for k, v in record.items()}
+    for field in INTERNED_FIELDS:
+        if field in product:
+            product[field] = sys.intern(product[field])
+    return product
+
+
+def read_products(path: str, add: Callable[[dict[str, str]], None]) -> str:
+    """Parses a JSONL, JSON, CSV or Parquet catalog file one record at a time.
+
+    Each product is passed to `add` with every value stored as a string,
+    like the original inventory. Returns the content hash of the file,
+    which is the catalog version.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    reader = READERS.get(extension)
+    if reader is None:
+        raise ValueError(
+            f"Unsupported catalog format '{extension}', expected one of {sorted(READERS)}"
+        )
+    with open(path, "rb") as f:
+        source = _HashingReader(f)
+        for record in reader(source):
+            add(_compact(record))
+        return source.version()
+
+
+def load_snapshot(path: str, previous: CatalogSnapshot | None = None) -> CatalogSnapshot:
+    """Builds an in-memory snapshot, products and index, from a catalog file.
+
+    Records that are unchanged since the `previous` snapshot are reused
+    rather than copied, so a reload only allocates the records that changed.
+    """
+    previous_products = previous.products if previous is not None else {}
+    products = {}
+
+    def add(product: dict[str, str]) -> None:
+        old = previous_products.get(product["product_id"])
+        products[product["product_id"]] = old if old == product else product
+
+    version = read_products(path, add)
+    # Numbered in byte-wise ID order like shared snapshots, so equal prices
+    # rank the same either way
+    records = [products[i] for i in sorted(products, key=lambda i: i.encode("utf-8"))]
+    return CatalogSnapshot(
+        version=version,
+        source=path,
+        products=MappingProxyType(products),
+        index=ProductIndex(records, *build_index_tables(records)),
+    )
+
+
+# --- Shared, memory-mapped snapshots ---
+# Layout: header, then the sections below, each 8-byte aligned. Records are
+# JSON in catalog file order; record number i is the i-th product ID in
+# byte-wise order, and `spans` holds the start and end of its JSON. The
+# search tables follow: price per record, record numbers in price order,
+# and for the words and facet values, sorted keys with the sorted record
+# numbers of each.
+SHARED_MAGIC = b"PCATv3\0\0"
+SHARED_TABLE_PARTS = ("keys", "key_offsets", "key_spans", "positions")
+SHARED_SECTIONS = (
+    "records",
+    "ids",
+    "id_offsets",
+    "spans",
+    "prices",
+    "price_order",
+    *(f"{table}_{part}" for table in ("postings", "facets") for part in SHARED_TABLE_PARTS),
+)
+SHARED_HEADER = struct.Struct(f"<8sQ16s{2 * len(SHARED_SECTIONS)}Q")
+SHARED_POINTER = "CURRENT"
+
+
+class _SharedTable(Mapping[str, Sequence[int]]):
+    """Memory-mapped word or facet value -> sorted record numbers."""
+
+    def __init__(self, keys, key_offsets, key_spans, positions):
+        self._keys = keys
+        self._key_offsets = key_offsets
+        self._key_spans = key_spans
+        self._positions = positions
+        self._count = len(key_offsets) - 1
+
+    def _key_at(self, i: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[i] : self._key_offsets[i + 1]])
+
+    def __getitem__(self, key: str) -> Sequence[int]:
+        encoded = key.encode("utf-8")
+        i = bisect.bisect_left(range(self._count), encoded, key=self._key_at)
+        if i == self._count or self._key_at(i) != encoded:
+            raise KeyError(key)
+        return self._positions[self._key_spans[2 * i] : self._key_spans[2 * i + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._key_at(i).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+
+class _SharedRecords(Sequence[Mapping[str, str]]):
+    def __init__(self, products: "SharedProducts"):
+        self._products = products
+
+    def __getitem__(self, position: int) -> dict[str, str]:
+        return self._products._record_at(position)
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+
+class SharedProducts(Mapping[str, Mapping[str, str]]):
+    """Read-only product mapping backed by a memory-mapped snapshot file.
+
+    Every process mapping the same file shares one copy of the catalog and
+    its search index in the page cache; records are decoded on access.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, count, version, *offsets = SHARED_HEADER.unpack_from(view)
+        if magic != SHARED_MAGIC:
+            raise ValueError(f"{path} is not a shared catalog snapshot")
+        self.version = version.rstrip(b"\0").decode("ascii")
+        self._count = count
+        sections = {
+            name: view[offsets[2 * i] : offsets[2 * i + 1]]
+            for i, name in enumerate(SHARED_SECTIONS)
+        }
+        for name, section in sections.items():
+            if name == "prices":
+                sections[name] = section.cast("d")
+            elif name.endswith(("offsets", "spans")):
+                sections[name] = section.cast("Q")
+            elif name.endswith(("order", "positions")):
+                sections[name] = section.cast("I")
+        self._sections = sections
+        self._records = sections["records"]
+        self._ids = sections["ids"]
+        self._id_offsets = sections["id_offsets"]
+        self._spans = sections["spans"]
+
+    def index(self) -> ProductIndex:
+        """The search index stored in the snapshot, read in place."""
+        sections = self._sections
+        return ProductIndex(
+            _SharedRecords(self),
+            sections["prices"],
+            sections["price_order"],
+            *(
+                _SharedTable(*(sections[f"{table}_{part}"] for part in SHARED_TABLE_PARTS))
+                for table in ("postings", "facets")
+            ),
+        )
+
+    def _id_at(self, i: int) -> bytes:
+        return bytes(self._ids[self._id_offsets[i] : self._id_offsets[i + 1]])
+
+    def _record_at(self, i: int) -> dict[str, str]:
+        return json.loads(bytes(self._records[self._spans[2 * i] : self._spans[2 * i + 1]]))
+
+    def _find(self, product_id: str) -> int:
+        key = product_id.encode("utf-8")
+        i = bisect.bisect_left(range(self._count), key, key=self._id_at)
+        if i < self._count and self._id_at(i) == key:
+            return i
+        raise KeyError(product_id)
+
+    def __getitem__(self, product_id: str) -> dict[str, str]:
+        return self._record_at(self._find(product_id))
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self._count):
+            yield self._id_at(i).decode("utf-8")
+
+    def __len__(self) -> int:
+        return self._count
+
+    def items(self) -> Iterator[tuple[str, dict[str, str]]]:
+        # Sequential scan, avoids a binary search per product
+        for i in range(self._count):
+            yield self._id_at(i).decode("utf-8"), self._record_at(i)
+
+
+def _write_table(f: BinaryIO, section, table: dict[str, array]) -> None:
+    keys = sorted(table, key=lambda k: k.encode("utf-8"))
+    key_offsets, key_spans, positions = array("Q", [0]), array("Q"), array("I")
+    with section("keys"):
+        for key in keys:
+            key_offsets.append(key_offsets[-1] + f.write(key.encode("utf-8")))
+    for key in keys:
+        key_spans.extend((len(positions), len(positions) + len(table[key])))
+        positions.extend(table[key])
+    for part, values in (
+        ("key_offsets", key_offsets),
+        ("key_spans", key_spans),
+        ("positions", positions),
+    ):
+        with section(part):
+            values.tofile(f)
+
+
+def write_shared_snapshot(path: str, directory: str) -> str:
+    """Writes a catalog file in the memory-mappable layout, returns its filename.
+
+    Records are streamed from the catalog file to the snapshot file, then
+    read back in record number order to build the search tables, so the
+    records are never all held in memory. Files are named after the catalog
+    version and written to a temporary name first, so readers never see a
+    partial file.
+    """
+    tmp_path = os.path.join(directory, f"catalog.{os.getpid()}.tmp")
+    record_positions: dict[str, int] = {}
+    spans = array("Q")
+    offsets = [0] * (2 * len(SHARED_SECTIONS))
+
+    @contextlib.contextmanager
+    def section(name: str) -> Iterator[None]:
+        # Records where a section starts and ends, 8-byte aligned for the casts
+        f.write(b"\0" * (-f.tell() % 8))
+        i = SHARED_SECTIONS.index(name)
+        offsets[2 * i] = f.tell()
+        yield
+        offsets[2 * i + 1] = f.tell()
+
+    try:
+        with open(tmp_path, "w+b") as f:
+            f.write(b"\0" * SHARED_HEADER.size)
+            with section("records"):
+                records_start = f.tell()
+
+                def add(product: dict[str, str]) -> None:
+                    start = f.tell() - records_start
+                    record = json.dumps(product, separators=(",", ":")).encode("utf-8")
+                    end = start + f.write(record)
+                    position = record_positions.get(product["product_id"])
+                    if position is None:
+                        record_positions[product["product_id"]] = len(spans) // 2
+                        spans.extend((start, end))
+                    else:
+                        # A repeated ID replaces the earlier record
+                        spans[2 * position : 2 * position + 2] = array("Q", (start, end))
+
+                version = read_products(path, add)
+            filename = f"catalog-{version}.bin"
+            if os.path.exists(os.path.join(directory, filename)):
+                return filename
+
+            # Record numbers follow the byte-wise ID order SharedProducts
+            # binary searches on
+            product_ids = sorted(record_positions, key=lambda i: i.encode("utf-8"))
+            id_offsets, sorted_spans = array("Q", [0]), array("Q")
+            with section("ids"):
+                for product_id in product_ids:
+                    id_offsets.append(id_offsets[-1] + f.write(product_id.encode("utf-8")))
+                    position = record_positions[product_id]
+                    sorted_spans.extend(spans[2 * position : 2 * position + 2])
+            del record_positions, spans
+            with section("id_offsets"):
+                id_offsets.tofile(f)
+            with section("spans"):
+                sorted_spans.tofile(f)
+
+            f.flush()
+
+            def records() -> Iterator[dict[str, str]]:
+                for i in range(len(product_ids)):
+                    start, end = sorted_spans[2 * i], sorted_spans[2 * i + 1]
+                    yield json.loads(os.pread(f.fileno(), end - start, records_start + start))
+
+            prices, price_order, postings, facets = build_index_tables(records())
+            with section("prices"):
+                prices.tofile(f)
+            with section("price_order"):
+                price_order.tofile(f)
+            for name, table in (("postings", postings), ("facets", facets)):
+                _write_table(f, lambda part: section(f"{name}_{part}"), table)
+
+            f.seek(0)
+            f.write(
+                SHARED_HEADER.pack(
+                    SHARED_MAGIC, len(product_ids), version.encode("ascii"), *offsets
+                )
+            )
+        os.replace(tmp_path, os.path.join(directory, filename))
+        return filename
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_pointer(directory: str) -> dict[str, Any] | None:
+    try:
+        with open(os.path.join(directory, SHARED_POINTER), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_pointer(directory: str, pointer: dict[str, Any]) -> None:
+    path = os.path.join(directory, SHARED_POINTER)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(pointer, f)
+    os.replace(tmp_path, path)
+
+
+class ProductCatalog:
+    """Holds the current catalog snapshot and hot-reloads it from disk.
+
+    Lookups read `snapshot` without taking any lock: swapping the reference is
+    atomic, so a reload running in a background thread never pauses them.
+    The first snapshot is loaded on first access.
+
+    With a `shared_dir`, several processes share one memory-mapped copy of
+    the catalog: the first process to load a new version of the catalog file
+    publishes it to the directory, the others map the published snapshot.
+    """
+
+    def __init__(self, path: str, shared_dir: str | None = None):
+        self.path = path
+        self.shared_dir = shared_dir
+        self._snapshot: CatalogSnapshot | None = None
+        self._file_stat: tuple[int, int] | None = None
+        self._shared_file: str | None = None
+        self._reload_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._reload_lock:
+                if self._snapshot is None:
+                    self._load()
+            snapshot = self._snapshot
+        return snapshot
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    def _stat(self) -> tuple[int, int]:
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self) -> CatalogSnapshot:
+        if self.shared_dir is not None:
+            return self._load_shared()
+        file_stat = self._stat()
+        # While the new snapshot is built the old one is still live, but
+        # they share every record that didn't change.
+        snapshot = load_snapshot(self.path, self._snapshot)
+        self._snapshot = snapshot
+        self._file_stat = file_stat
+        return snapshot
+
+    def _load_shared(self) -> CatalogSnapshot:
+        os.makedirs(self.shared_dir, exist_ok=True)
+        # The file lock serializes processes, so each catalog version is only
+        # parsed and published once.
+        with open(os.path.join(self.shared_dir, "catalog.lock"), "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                file_stat = self._stat()
+                pointer = _read_pointer(self.shared_dir)
+                if (
+                    pointer is None
+                    or pointer["source"] != self.path
+                    or tuple(pointer["source_stat"]) != file_stat
+                ):
+                    filename = write_shared_snapshot(self.path, self.shared_dir)
+                    pointer = {
+                        "file": filename,
+                        "source": self.path,
+                        "source_stat": list(file_stat),
+                    }
+                    _write_pointer(self.shared_dir, pointer)
+                    # Processes still mapping older files keep them alive
+                    for stale in glob.glob(os.path.join(self.shared_dir, "catalog-*.bin")):
+                        if os.path.basename(stale) != filename:
+                            os.remove(stale)
+                products = SharedProducts(os.path.join(self.shared_dir, pointer["file"]))
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+        snapshot = CatalogSnapshot(
+            version=products.version,
+            source=self.path,
+            products=products,
+            index=products.index(),
+        )
+        self._snapshot = snapshot
+        self._file_stat = file_stat
+        self._shared_file = pointer["file"]
+        return snapshot
+
+    def reload(self) -> CatalogSnapshot:
+        """Builds a new snapshot from the catalog file and swaps it in.
+
+        Blocking; run it in a worker thread from async code. Concurrent
+        reloads are serialized.
+        """
+        with self._reload_lock:
+            previous = self._snapshot
+            snapshot = self._load()
+        if previous is None or previous.version != snapshot.version:
+            print(
+                f"Loaded product catalog {snapshot.version} "
+                f"({len(snapshot)} products) from {self.path}"
+            )
+        return snapshot
+
+    def has_changed(self) -> bool:
+        """Whether the catalog file (or the shared snapshot) changed since the last load."""
+        try:
+            if self._stat() != self._file_stat:
+                return True
+            if self.shared_dir is not None:
+                pointer = _read_pointer(self.shared_dir)
+                return pointer is not None and pointer["file"] != self._shared_file
+            return False
+        except FileNotFoundError:
+            # The file is mid-replacement, keep serving the current snapshot
+            return False
@@ -0,0 +1,205 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Container
+
+# A (user message, agent response) pair
+Turn = tuple[str, str]
+
+
+class ConversationStore:
+    """Bounded per-contextId conversation memory with LRU eviction.
+
+    Lets the seller remember earlier turns of a conversation, so callers only
+    need to send what is new on each turn. At most `max_contexts` contexts are
+    kept, evicting the least recently used one, and each keeps its last
+    `max_turns` turns. Safe to use from several threads.
+    """
+
+    def __init__(self, max_contexts: int = 1000, max_turns: int = 10):
+        self.max_contexts = max_contexts
+        self.max_turns = max_turns
+        self._contexts: OrderedDict[str, deque[Turn]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def history(self, context_id: str) -> tuple[Turn, ...]:
+        """Returns the turns recorded for a context, oldest first."""
+        with self._lock:
+            turns = self._contexts.get(context_id)
+            if turns is None:
+                return ()
+            self._contexts.move_to_end(context_id)
+            return tuple(turns)
+
+    def append(self, context_id: str, user_message: str, agent_response: str) -> None:
+        with self._lock:
+            turns = self._contexts.get(context_id)
+            if turns is None:
+                turns = self._contexts[context_id] = deque(maxlen=self.max_turns)
+            else:
+                self._contexts.move_to_end(context_id)
+            turns.append((user_message, agent_response))
+            while len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._contexts)
+
+
+class SqliteConversationStore:
+    """ConversationStore kept in a local SQLite file shared by several processes.
+
+    Used when the server runs multiple workers, so that a follow-up turn sees
+    the conversation no matter which worker handled the earlier turns. Same
+    bounds and least-recently-used eviction as `ConversationStore`.
+    """
+
+    def __init__(self, path: str, max_contexts: int = 1000, max_turns: int = 10):
+        self.max_contexts = max_contexts
+        self.max_turns = max_turns
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS contexts (
+                context_id TEXT PRIMARY KEY,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS contexts_last_used ON contexts (last_used);
+            CREATE TABLE IF NOT EXISTS turns (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                context_id TEXT NOT NULL,
+                user_message TEXT NOT NULL,
+                agent_response TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS turns_context ON turns (context_id, seq);
+            """
+        )
+        self._lock = threading.Lock()
+
+    def history(self, context_id: str) -> tuple[Turn, ...]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_message, agent_response FROM turns"
+                " WHERE context_id = ? ORDER BY seq DESC LIMIT ?",
+                (context_id, self.max_turns),
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    "UPDATE contexts SET last_used = ? WHERE context_id = ?",
+                    (time.time(), context_id),
+                )
+        return tuple(reversed(rows))
+
+    def append(self, context_id: str, user_message: str, agent_response: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO contexts (context_id, last_used) VALUES (?, ?)"
+                    " ON CONFLICT (context_id) DO UPDATE SET last_used = excluded.last_used",
+                    (context_id, time.time()),
+                )
+                self._conn.execute(
+                    "INSERT INTO turns (context_id, user_message, agent_response)"
+                    " VALUES (?, ?, ?)",
+                    (context_id, user_message, agent_response),
+                )
+                self._conn.execute(
+                    "DELETE FROM turns WHERE context_id = ? AND seq NOT IN"
+                    " (SELECT seq FROM turns WHERE context_id = ? ORDER BY seq DESC LIMIT ?)",
+                    (context_id, context_id, self.max_turns),
+                )
+                evicted = "(SELECT context_id FROM contexts ORDER BY last_used DESC LIMIT -1 OFFSET ?)"
+                self._conn.execute(
+                    f"DELETE FROM turns WHERE context_id IN {evicted}",
+                    (self.max_contexts,),
+                )
+                self._conn.execute(
+                    f"DELETE FROM contexts WHERE context_id IN {evicted}",
+                    (self.max_contexts,),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM contexts").fetchone()[0]
+
+
+_NUMBER_RE = re.compile(r"\b\d{3,}\b")
+
+
+def compact_response(
+    response: str, product_ids: Container[str], max_chars: int = 150, max_products: int = 20
+) -> str:
+    """The form of an agent response that is remembered for later turns.
+
+    Keeps the start of the answer and the catalog product IDs it mentions,
+    which is what follow-ups ("the cheaper one") refer back to, rather than
+    the full prose that would otherwise go into every later prompt.
+    """
+    mentioned = []
+    for number in _NUMBER_RE.findall(response):
+        if number in product_ids and number not in mentioned:
+            mentioned.append(number)
+            if len(mentioned) == max_products:
+                break
+    summary = _shorten(" ".join(response.split()), max_chars)
+    if mentioned:
+        summary += f" (products: {', '.join(mentioned)})"
+    return summary
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    return text if len(text) <= max_chars else text[:max_chars] + " [...]"
+
+
+def format_history(
+    turns: tuple[Turn, ...], max_chars: int = 1500, max_message_chars: int = 600
+) -> str:
+    """Renders the turns for the agent prompt, most recent ones first to fit.
+
+    Messages longer than `max_message_chars` are cut short, and the
+    oldest turns are left out once the rendered history would exceed
+    `max_chars`, so follow-up prompts stay bounded however long the
+    conversation gets.
+    """
+    if not turns:
+        return "(This is the first message of the conversation.)"
+    rendered: list[str] = []
+    size = 0
+    for user_message, agent_response in reversed(turns):
+        user_message = _shorten(user_message, max_message_chars)
+        agent_response = _shorten(agent_response, max_message_chars)
+        turn = f"User: {user_message}\nYou: {agent_response}"
+        if rendered and size + len(turn) > max_chars:
+            break
+        rendered.append(turn)
+        size += len(turn) + 1
+    omitted = len(turns) - len(rendered)
+    if omitted:
+        rendered.append(f"({omitted} earlier turns omitted.)")
+    return "\n".join(reversed(rendered))
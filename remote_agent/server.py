@@ -0,0 +1,216 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import contextlib
+import hmac
+import logging
+import os
+
+from a2a.types import AgentCapabilities, AgentSkill, AgentCard
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.apps import A2AStarletteApplication
+from a2a.server.tasks import InMemoryTaskStore
+from agent import CATALOG, ProductSellerAgent
+from agent_executor import ProductSellerAgentExecutor
+from compression import CompressionMiddleware
+from sqlite_task_store import SqliteTaskStore
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+logger = logging.getLogger(__name__)
+
+
+class ProductSellerApplication(A2AStarletteApplication):
+    """A2AStarletteApplication that serializes JSON-RPC results faster.
+
+    The SDK dumps each result to Python objects and then encodes them with the
+    standard json module; `model_dump_json` encodes the model directly in
+    pydantic-core instead. Streaming and error responses are left to the SDK.
+    """
+
+    def _create_response(self, handler_result) -> Response:
+        # Success responses are RootModels; streams and errors are not
+        root = getattr(handler_result, "root", None)
+        if root is None:
+            return super()._create_response(handler_result)
+        return Response(
+            root.model_dump_json(exclude_none=True), media_type="application/json"
+        )
+
+
+def check_admin_token(request: Request) -> JSONResponse | None:
+    """Returns an error response unless the request may use admin endpoints.
+
+    Admin endpoints are disabled unless CATALOG_ADMIN_TOKEN is set; callers
+    must send it as a bearer token.
+    """
+    admin_token = os.getenv("CATALOG_ADMIN_TOKEN")
+    if not admin_token:
+        return JSONResponse({"error": "Admin endpoints are disabled"}, status_code=404)
+    authorization = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(authorization.encode(), f"Bearer {admin_token}".encode()):
+        return JSONResponse({"error": "Unauthorized"}, status_code=401)
+    return None
+
+
+async def reload_catalog(request: Request) -> JSONResponse:
+    """Admin endpoint that rebuilds the catalog snapshot from its file.
+
+    The snapshot is built in a worker thread, so lookups keep being served
+    from the current snapshot until the new one is swapped in.
+    """
+    error = check_admin_token(request)
+    if error is not None:
+        return error
+    try:
+        snapshot = await asyncio.to_thread(CATALOG.reload)
+    except Exception as e:
+        logger.error(f"Catalog reload failed: {e}")
+        return JSONResponse({"error": f"Catalog reload failed: {e}"}, status_code=500)
+    return JSONResponse({"version": snapshot.version, "products": len(snapshot)})
+
+
+async def usage_report(request: Request) -> JSONResponse:
+    """Admin endpoint reporting LLM usage per session and in total."""
+    error = check_admin_token(request)
+    if error is not None:
+        return error
+    return JSONResponse(request.app.state.usage_ledger.report())
+
+
+async def watch_catalog(interval: float):
+    """Reloads the catalog whenever its file changes on disk."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            if CATALOG.has_changed():
+                await asyncio.to_thread(CATALOG.reload)
+        except Exception as e:
+            # Keep serving the current snapshot and retry on the next change
+            logger.error(f"Catalog reload failed: {e}")
+
+
+def build_lifespan(agent: ProductSellerAgent, catalog_watch_interval: float):
+    """Warms the crew up in the background once the server is accepting requests.
+
+    The agent card is static, so `/.well-known/agent.json` is answered straight
+    away while crewai/litellm are still loading in a worker thread. When
+    `catalog_watch_interval` is positive the catalog file is also polled for
+    changes every that many seconds.
+    """
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        async def warm_up():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            try:
+                await asyncio.to_thread(agent.warm_up)
+                logger.info(f"Crew warm-up finished in {loop.time() - started:.2f}s")
+            except Exception as e:
+                # The agent is built again on first use, surfacing the error there
+                logger.error(f"Crew warm-up failed: {e}")
+
+        background_tasks = [asyncio.create_task(warm_up())]
+        if catalog_watch_interval > 0:
+            background_tasks.append(
+                asyncio.create_task(watch_catalog(catalog_watch_interval))
+            )
+        yield
+        for task in background_tasks:
+            task.cancel()
+
+    return lifespan
+
+
+def build_agent_card(agent_base_url: str) -> AgentCard:
+    capabilities = AgentCapabilities(streaming=True)
+    skill = AgentSkill(
+        id="get_product_details",
+        name="Product Details Lookup Tool",
+        description=(
+            "Retrieves product details using a product ID from the product catalog. "
+            'A data part {"product_ids": [...]} looks up many products at once and '
+            "returns their records as a data part."
+        ),
+        tags=["product lookup", "inventory"],
+        examples=["What are the details for product 27837?"],
+        inputModes=ProductSellerAgent.SUPPORTED_CONTENT_TYPES + ["application/json"],
+        outputModes=ProductSellerAgent.SUPPORTED_CONTENT_TYPES + ["application/json"],
+    )
+    search_skill = AgentSkill(
+        id="search_products",
+        name="Product Search Tool",
+        description=(
+            "Searches the product catalog by text with optional brand, category, "
+            "department and price range filters, returning the cheapest products "
+            "that match every word of the text."
+        ),
+        tags=["product search", "inventory"],
+        examples=[
+            "Find men's shorts under $50",
+            "What Hanes products do you have in Underwear?",
+        ],
+    )
+    return AgentCard(
+        name="product_seller_agent",
+        description="Provides product details based on a product ID and searches the product catalog by text, brand, category, department and price.",
+        url=agent_base_url, 
+        version="1.0.0",
+        # Use the SUPPORTED_CONTENT_TYPES from the new agent class
+        defaultInputModes=ProductSellerAgent.SUPPORTED_CONTENT_TYPES, 
+        defaultOutputModes=ProductSellerAgent.SUPPORTED_CONTENT_TYPES,
+        capabilities=capabilities,
+        skills=[skill, search_skill],
+    )
+
+
+def create_app() -> Starlette:
+    """Builds the seller's Starlette app from the environment.
+
+    Also used as the uvicorn app factory in each worker process when the
+    server runs with several workers, see __main__.py.
+    """
+    # Set when running several workers; tasks then live in a shared local
+    # store so that any worker can answer `tasks/get`.
+    shared_dir = os.getenv("SELLER_SHARED_DIR")
+    task_store = (
+        SqliteTaskStore(os.path.join(shared_dir, "tasks.db"))
+        if shared_dir
+        else InMemoryTaskStore()
+    )
+
+    agent_executor = ProductSellerAgentExecutor()
+    request_handler = DefaultRequestHandler(
+        agent_executor=agent_executor,
+        task_store=task_store,
+    )
+    server = ProductSellerApplication(
+        agent_card=build_agent_card(os.environ["AGENT_BASE_URL"]),
+        http_handler=request_handler,
+    )
+
+    catalog_watch_interval = float(os.getenv("CATALOG_WATCH_INTERVAL", "0"))
+    app = server.build(
+        lifespan=build_lifespan(agent_executor.agent, catalog_watch_interval)
+    )
+    app.add_route("/admin/catalog/reload", reload_catalog, methods=["POST"])
+    app.add_route("/admin/usage", usage_report, methods=["GET"])
+    app.add_middleware(CompressionMiddleware)
+    app.state.usage_ledger = agent_executor.usage
+    return app
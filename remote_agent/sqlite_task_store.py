@@ -0,0 +1,67 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import asyncio
+import sqlite3
+import threading
+
+from a2a.server.tasks import TaskStore
+from a2a.types import Task
+
+
+class SqliteTaskStore(TaskStore):
+    """TaskStore kept in a local SQLite file shared by several processes.
+
+    Lets any worker of a multi-worker server answer `tasks/get` for a task
+    created by another one. Uses the standard library driver, with the
+    blocking calls run in a worker thread.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        # WAL lets workers read tasks while another one is writing
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks (id TEXT PRIMARY KEY, task TEXT NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def _execute(self, sql: str, params: tuple) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    async def save(self, task: Task) -> None:
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO tasks (id, task) VALUES (?, ?)"
+            " ON CONFLICT (id) DO UPDATE SET task = excluded.task",
+            (task.id, task.model_dump_json(exclude_none=True)),
+        )
+
+    async def get(self, task_id: str) -> Task | None:
+        rows = await asyncio.to_thread(
+            self._execute, "SELECT task FROM tasks WHERE id = ?", (task_id,)
+        )
+        if not rows:
+            return None
+        return Task.model_validate_json(rows[0][0])
+
+    async def delete(self, task_id: str) -> None:
+        await asyncio.to_thread(
+            self._execute, "DELETE FROM tasks WHERE id = ?", (task_id,)
+        )
@@ -0,0 +1,97 @@
+"""
+Copyright 2025 Google LLC
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    https://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, fields
+from typing import Any
+
+
+@dataclass
+class Usage:
+    """LLM usage and cost drivers of one request, or a roll-up of several."""
+
+    requests: int = 0
+    coalesced_requests: int = 0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    model_latency_s: float = 0.0
+    response_bytes: int = 0
+
+    def add(self, other: "Usage") -> None:
+        for field in fields(self):
+            setattr(self, field.name, getattr(self, field.name) + getattr(other, field.name))
+
+    def as_dict(self) -> dict[str, Any]:
+        usage = asdict(self)
+        usage["model_latency_s"] = round(self.model_latency_s, 3)
+        return usage
+
+
+def crew_usage(result: Any, latency_s: float) -> Usage:
+    """Reads the usage metrics `crew.kickoff` reports on its CrewOutput.
+
+    crewai sums the token counts its agents have accumulated and never resets
+    them, so these are only the request's own usage because
+    `ProductSellerAgent.invoke` builds a fresh agent for every crew run.
+    """
+    token_usage = getattr(result, "token_usage", None)
+    return Usage(
+        requests=1,
+        llm_calls=getattr(token_usage, "successful_requests", 0),
+        prompt_tokens=getattr(token_usage, "prompt_tokens", 0),
+        completion_tokens=getattr(token_usage, "completion_tokens", 0),
+        model_latency_s=latency_s,
+    )
+
+
+class UsageLedger:
+    """Rolls usage up per session (A2A contextId) and in total.
+
+    Keeps the `max_sessions` most recently active sessions. Process-local:
+    with several workers each one reports the sessions it served.
+    """
+
+    def __init__(self, max_sessions: int = 1000):
+        self.max_sessions = max_sessions
+        self.total = Usage()
+        self._sessions: OrderedDict[str, Usage] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, session_id: str, usage: Usage) -> Usage:
+        """Adds a request's usage and returns a copy of the session's totals."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._sessions[session_id] = Usage()
+            else:
+                self._sessions.move_to_end(session_id)
+            session.add(usage)
+            self.total.add(usage)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return Usage(**asdict(session))
+
+    def report(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "total": self.total.as_dict(),
+                "sessions": {
+                    session_id: usage.as_dict()
+                    for session_id, usage in self._sessions.items()
+                },
+            }